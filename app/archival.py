@@ -0,0 +1,67 @@
+"""
+Hot/cold tiering for tasks.
+
+Tasks older than a cutoff are moved from `tasks` into `tasks_archive` so the
+hot collection and its indexes stay small. Tasks carry no status field, so age
+is the only archival criterion. Each batch is copy-then-delete and
+the copy ignores duplicates, so a crashed run simply resumes on the next one.
+"""
+
+from datetime import datetime, timedelta
+
+from pymongo.errors import BulkWriteError
+
+from app import database
+from app.config import settings
+
+DUPLICATE_KEY = 11000
+
+
+def archive_query(cutoff: datetime) -> dict:
+    """Mongo filter matching tasks that belong in the cold tier."""
+    return {"created_at": {"$lt": cutoff}}
+
+
+async def archive_batch(query: dict, batch_size: int) -> int:
+    """Move one batch of matching tasks to `tasks_archive`; return how many moved."""
+    # Sorting on created_at lets the created_at index serve filter and order
+    cursor = database.db.tasks.find(query).sort("created_at", 1).limit(batch_size)
+    batch = await cursor.to_list(length=batch_size)
+    if not batch:
+        return 0
+
+    archived_at = datetime.utcnow()
+    for doc in batch:
+        doc["archived_at"] = archived_at
+
+    try:
+        await database.db.tasks_archive.insert_many(batch, ordered=False)
+    except BulkWriteError as exc:
+        # Already archived by an interrupted run → safe to ignore
+        errors = exc.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+
+    ids = [doc["_id"] for doc in batch]
+    await database.db.tasks.delete_many({"_id": {"$in": ids}})
+    return len(batch)
+
+
+async def archive_old_tasks(
+    older_than_days: int = settings.archive_after_days,
+    batch_size: int = settings.archive_batch_size,
+    max_batches: int | None = None,
+) -> int:
+    """Archive tasks in batches until none match (or `max_batches` is hit)."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    query = archive_query(cutoff)
+
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = await archive_batch(query, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
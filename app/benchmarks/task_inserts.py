@@ -0,0 +1,77 @@
+"""
+Benchmark task inserts/sec with and without group-commit batching.
+
+    python -m app.benchmarks.task_inserts --requests 5000 --concurrency 500
+
+Writes into a throwaway `bench_tasks` collection that is dropped afterwards.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from app import database
+from app.write_batching import InsertBatcher
+
+COLLECTION = "bench_tasks"
+
+
+def make_task(i: int) -> dict:
+    """Task document shaped like the ones create_task writes."""
+    return {
+        "_id": str(uuid.uuid4()),
+        "title": f"bench task {i}",
+        "description": "",
+        "owner": "bench",
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def run(insert, requests: int, concurrency: int) -> float:
+    """Issue `requests` inserts with at most `concurrency` in flight; return inserts/sec."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with sem:
+            await insert(make_task(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def _main(args):
+    await database.connect_to_mongo()
+    collection = database.db[COLLECTION]
+    try:
+        await collection.drop()
+        single = await run(collection.insert_one, args.requests, args.concurrency)
+        print(f"insert_one:      {single:,.0f} inserts/sec")
+
+        await collection.drop()
+        batcher = InsertBatcher(
+            COLLECTION, window=args.window_ms / 1000, max_batch=args.batch_size
+        )
+        batched = await run(batcher.insert, args.requests, args.concurrency)
+        print(
+            f"batched inserts: {batched:,.0f} inserts/sec "
+            f"({batcher.flushes} flushes, {batched / single:.1f}x)"
+        )
+    finally:
+        await collection.drop()
+        await database.close_mongo_connection()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark task insert batching.")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--batch-size", type=int, default=100)
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
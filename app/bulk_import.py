@@ -0,0 +1,224 @@
+"""
+Bulk user importer for onboarding large customers.
+
+    python -m app.bulk_import users.csv
+    python -m app.bulk_import users.ndjson --workers 8 --chunk-size 2000
+
+Input rows need `username` and `password`. Passwords are hashed across a
+process pool, users are inserted with unordered `insert_many`, duplicates are
+reported from unique-index errors, and welcome emails are published in batches
+over a single broker connection.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app import database
+from app.schemas.user_schema import UserCreate
+from app.utils.security import hash_password
+
+DUPLICATE_KEY = 11000
+
+
+# ==========================
+# Input Parsing
+# ==========================
+
+
+def read_rows(path: str, fmt: str | None = None):
+    """
+    Yield raw rows from a CSV or NDJSON file.
+
+    NDJSON lines that are not valid JSON are yielded as the raw string, so
+    `validate_rows` counts them as invalid instead of aborting the import.
+    """
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield line.rstrip("\n")
+
+
+def chunked(iterable, size: int):
+    """Split an iterable into lists of at most `size` items."""
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+# ==========================
+# Import Steps
+# ==========================
+
+
+def validate_rows(rows: list, report: dict) -> list[UserCreate]:
+    """Validate rows with the registration schema; count and skip bad ones."""
+    users = []
+    for row in rows:
+        try:
+            # model_validate also rejects non-object rows (lists, bad JSON lines)
+            users.append(UserCreate.model_validate(row))
+        except ValidationError as exc:
+            report["invalid"] += 1
+            name = row.get("username") if isinstance(row, dict) else row
+            print(f"Invalid row {name!r}: {exc.errors()[0]['msg']}")
+    return users
+
+
+async def insert_users(docs: list[dict], report: dict) -> list[dict]:
+    """Insert a chunk unordered; return the docs that were actually inserted."""
+    if not docs:
+        return []
+    try:
+        await database.db.users.insert_many(docs, ordered=False)
+        return docs
+    except BulkWriteError as exc:
+        failed = set()
+        for err in exc.details.get("writeErrors", []):
+            failed.add(err["index"])
+            username = docs[err["index"]]["username"]
+            if err.get("code") == DUPLICATE_KEY:
+                report["duplicates"] += 1
+                print(f"Duplicate username: {username}")
+            else:
+                report["failed"] += 1
+                print(f"Insert failed for {username}: {err.get('errmsg')}")
+        return [doc for i, doc in enumerate(docs) if i not in failed]
+
+
+def enqueue_welcome_emails(users: list[dict]):
+    """Publish welcome-email jobs for a chunk over one broker connection."""
+    # Local import: Celery is only loaded when emails are actually sent
+    from app.workers.celery_app import celery_app
+
+    with celery_app.producer_or_acquire() as producer:
+        for user in users:
+            # Same idempotency key format as /auth/register
+            job_id = f"welcome_email:{user['_id']}"
+            celery_app.send_task(
+                "taskhub.send_welcome_email",
+                args=[user["username"], job_id],
+                producer=producer,
+            )
+
+
+async def import_users(
+    path: str,
+    fmt: str | None = None,
+    workers: int | None = None,
+    chunk_size: int = 1000,
+    send_emails: bool = True,
+) -> dict:
+    """Run the full import and return a summary report."""
+    report = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "failed": 0}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows in chunked(read_rows(path, fmt), chunk_size):
+            report["read"] += len(rows)
+            users = validate_rows(rows, report)
+
+            # bcrypt is CPU-bound → spread it across processes
+            hashes = pool.map(
+                hash_password,
+                [u.password for u in users],
+                chunksize=max(1, len(users) // ((workers or os.cpu_count() or 1) * 4)),
+            )
+
+            now = datetime.utcnow()
+            docs = [
+                {
+                    "_id": str(uuid.uuid4()),
+                    "username": user.username,
+                    "hashed_password": hashed,
+                    "created_at": now,
+                }
+                for user, hashed in zip(users, hashes, strict=True)
+            ]
+
+            inserted = await insert_users(docs, report)
+            report["inserted"] += len(inserted)
+            if send_emails and inserted:
+                enqueue_welcome_emails(inserted)
+
+            elapsed = time.perf_counter() - started
+            print(
+                f"{report['inserted']} users imported "
+                f"({report['inserted'] / elapsed:.1f} users/sec)"
+            )
+
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    report["users_per_sec"] = round(
+        report["inserted"] / max(report["seconds"], 1e-9), 1
+    )
+    return report
+
+
+async def has_unique_username_index() -> bool:
+    """True if `users` has a unique index on `username` alone."""
+    indexes = await database.db.users.index_information()
+    return any(
+        index.get("unique") and index["key"] == [("username", 1)]
+        for index in indexes.values()
+    )
+
+
+# ==========================
+# CLI
+# ==========================
+
+
+async def _main(args):
+    await database.connect_to_mongo()
+    try:
+        # Duplicate detection relies on the unique username index, which API
+        # startup only warns about when it cannot be built
+        await database.ensure_indexes()
+        if not await has_unique_username_index():
+            raise SystemExit(
+                "users.username has no unique index, so duplicates cannot be "
+                "detected. Remove existing duplicate usernames and rerun "
+                "(see 'Duplicate usernames' in the Readme)."
+            )
+        report = await import_users(
+            args.path,
+            fmt=args.format,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            send_emails=not args.no_emails,
+        )
+    finally:
+        await database.close_mongo_connection()
+    print(json.dumps(report, indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import users.")
+    parser.add_argument("path", help="CSV or NDJSON file with username,password")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--workers", type=int, help="Hashing processes (default: CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--no-emails", action="store_true")
+    asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
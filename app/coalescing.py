@@ -0,0 +1,153 @@
+"""
+Request coalescing for hot MongoDB reads.
+
+- `SingleFlight`: identical in-flight queries share one Motor call
+- `BatchLoader`: distinct point lookups issued within a short window are
+  merged into a single `$in` query (DataLoader-style)
+
+Results are shared between awaiters, so callers must treat them as read-only.
+"""
+
+import asyncio
+
+from app import database
+from app.config import settings
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share the same key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.coalesced = 0
+        self._inflight: dict = {}
+
+    async def do(self, key, fn, *args):
+        """Run `fn(*args)` once per key; concurrent callers await the same result."""
+        fut = self._inflight.get(key)
+        if fut is not None and fut.get_loop() is not asyncio.get_running_loop():
+            fut = None  # Left over from a closed event loop
+        if fut is None:
+            self.executed += 1
+            fut = asyncio.ensure_future(fn(*args))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        # Shield so one cancelled awaiter does not cancel the shared query
+        return await asyncio.shield(fut)
+
+    def invalidate(self, key):
+        """Make the next call for `key` start a fresh query (after a write)."""
+        # Current awaiters keep their result; only new callers stop joining it
+        self._inflight.pop(key, None)
+
+    def _forget(self, key, fut):
+        # A newer query may have replaced this one after invalidate()
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {"executed": self.executed, "coalesced": self.coalesced}
+
+
+class BatchLoader:
+    """
+    Collect point lookups for `window` seconds (or `max_batch` keys) and
+    resolve them with one call to `batch_fn(keys) -> {key: value}`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn,
+        window: float = settings.coalesce_window_ms / 1000,
+        max_batch: int = settings.coalesce_max_batch,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self.requested = 0
+        self.executed = 0
+        self.coalesced = 0
+        self._pending: dict = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._running: set = set()  # Strong refs so batch tasks are not GC'd
+
+    async def load(self, key):
+        """Return the value for `key` (None if missing), batched with its neighbours."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # New event loop (e.g. per-test loops) → drop state bound to the old one
+            self._loop, self._pending, self._timer = loop, {}, None
+
+        self.requested += 1
+        fut = self._pending.get(key)
+        if fut is None:
+            fut = loop.create_future()
+            self._pending[key] = fut
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(fut)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, pending: dict):
+        self.executed += 1
+        try:
+            results = await self.batch_fn(list(pending))
+        except Exception as exc:
+            for fut in pending.values():
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for key, fut in pending.items():
+            if not fut.done():
+                fut.set_result(results.get(key))
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+        }
+
+
+# ==========================
+# MongoDB Loaders
+# ==========================
+
+
+async def _users_by_username(usernames: list[str]) -> dict:
+    cursor = database.db.users.find({"username": {"$in": usernames}})
+    docs = await cursor.to_list(length=len(usernames))
+    return {doc["username"]: doc for doc in docs}
+
+
+user_loader = BatchLoader("users.by_username", _users_by_username)
+task_list_flight = SingleFlight("tasks.by_owner")
+
+
+async def get_user_by_username(username: str) -> dict | None:
+    """Coalesced replacement for `db.users.find_one({"username": ...})`."""
+    return await user_loader.load(username)
+
+
+def coalescing_stats() -> dict:
+    """Executed vs coalesced query counts for every loader."""
+    return {loader.name: loader.stats() for loader in (user_loader, task_list_flight)}
@@ -24,6 +24,37 @@ class Settings(BaseSettings):
     # === Redis / Celery Configuration ===
     redis_broker: str  # Redis URL for Celery tasks
 
+    # === Background Job Retry Policy ===
+    task_max_retries: int = 5  # Attempts before a job is dead-lettered
+    task_retry_backoff_base: float = 2.0  # First backoff window (seconds)
+    task_retry_backoff_max: float = 300.0  # Upper bound on any backoff window
+    circuit_failure_threshold: int = 5  # Consecutive failures that open a breaker
+    circuit_reset_seconds: float = 30.0  # How long a breaker stays open
+    circuit_max_deferrals: int = 1000  # Open-breaker reschedules before giving up
+
+    # === Task Archival (hot/cold tiering) ===
+    archive_after_days: int = 90  # Tasks older than this move to tasks_archive
+    archive_batch_size: int = 500  # Documents moved per batch
+    archive_interval_seconds: int = 3600  # How often Celery beat runs the job
+
+    # === Read Coalescing ===
+    coalesce_window_ms: float = 2.0  # How long point lookups wait to be batched
+    coalesce_max_batch: int = 100  # Flush a batch early once it has this many keys
+
+    # === Write Batching (group commit for task inserts) ===
+    task_write_batching: bool = False  # Batch POST /tasks inserts into insert_many
+    write_batch_window_ms: float = 5.0  # Max time an insert waits for its batch
+    write_batch_max_size: int = 100  # Flush early once a batch has this many docs
+
+    # === Idempotency-Key (POST /tasks, /auth/register) ===
+    idempotency_ttl_seconds: int = 86400  # How long stored responses are replayed
+    idempotency_wait_seconds: float = 10.0  # Max wait on an in-progress duplicate
+
+    # === Per-request Profiling (opt-in) ===
+    profiling_enabled: bool = False  # Install the profiling middleware + hooks
+    profiling_token: str = ""  # Required value of the X-Profile request header
+    profiling_output_dir: str = ""  # Store reports here instead of returning them
+
     # Load settings from `.env` and ignore extras not defined here
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -1,8 +1,10 @@
 # app/database.py
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
 
 from app.config import settings
+from app.profiling import mongo_event_listeners
 
 # Globals to store client and db instance
 client: AsyncIOMotorClient | None = None
@@ -26,11 +28,28 @@ async def connect_to_mongo(force: bool = False):
             pass  # Client is dead → reconnect
 
     # Create a brand new client
-    client = AsyncIOMotorClient(settings.mongodb_uri)
+    client = AsyncIOMotorClient(
+        settings.mongodb_uri, event_listeners=mongo_event_listeners()
+    )
     db = client[settings.mongodb_db]
     print("✅ MongoDB connected successfully.")
 
 
+async def ensure_indexes():
+    """Create the indexes hot queries rely on (no-op if they already exist)."""
+    try:
+        await db.users.create_index("username", unique=True)
+    except OperationFailure as exc:
+        # Existing duplicate usernames block the unique index; keep serving and
+        # surface them instead (see "Duplicate usernames" in the Readme)
+        print(f"⚠️ Unique username index not created: {exc}")
+    await db.tasks.create_index("owner")
+    await db.tasks.create_index("created_at")  # archival cutoff scans
+    await db.tasks_archive.create_index("owner")
+    # Idempotency-Key fallback store: Mongo reaps records once expires_at passes
+    await db.idempotency_keys.create_index("expires_at", expireAfterSeconds=0)
+
+
 async def close_mongo_connection():
     """Close MongoDB connection on FastAPI shutdown."""
     global client
@@ -1,16 +1,31 @@
-from datetime import datetime
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import time
+from datetime import datetime, timedelta
 
-from app.database import db
+import redis.asyncio as aioredis
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pymongo.errors import DuplicateKeyError
+from redis.exceptions import RedisError
+
+from app import database
+from app.config import settings
+from app.workers.retry_policy import get_breaker
 
 
 async def get_job_result(job_id: str):
     """Return the saved job result if the job is already completed."""
-    return await db.job_log.find_one({"job_id": job_id, "status": "completed"})
+    return await database.db.job_log.find_one({"job_id": job_id, "status": "completed"})
 
 
 async def mark_job_started(job_id: str):
     """Mark a job as started in an idempotent way (insert only once)."""
-    await db.job_log.update_one(
+    await database.db.job_log.update_one(
         {"job_id": job_id},
         {
             "$setOnInsert": {
@@ -25,7 +40,7 @@ async def mark_job_started(job_id: str):
 
 async def save_job_result(job_id: str, result: dict):
     """Save job result and mark job as completed."""
-    await db.job_log.update_one(
+    await database.db.job_log.update_one(
         {"job_id": job_id},
         {
             "$set": {
@@ -37,3 +52,214 @@ async def save_job_result(job_id: str, result: dict):
         },
         upsert=True,
     )
+
+
+# ==========================
+# HTTP Idempotency-Key Support
+# ==========================
+# Records live in Redis (`idem:<key>`) with the `idempotency_keys` Mongo
+# collection as fallback while Redis is unavailable. Both are TTL-bounded.
+# A key claimed in one store during a failover is not visible in the other, so
+# completions made while the Redis breaker is not closed go to both stores.
+# In-progress claims only hold a short lease, so a crashed request frees its key
+# quickly; completed responses are kept for the full idempotency TTL.
+
+_redis_client: tuple | None = None  # (event loop, client)
+
+
+def _lease_seconds() -> int:
+    """How long an in-progress claim holds its key (a few waiter timeouts)."""
+    return max(1, math.ceil(settings.idempotency_wait_seconds * 3))
+
+
+def _redis():
+    """Return a Redis client bound to the running event loop."""
+    global _redis_client
+    loop = asyncio.get_running_loop()
+    if _redis_client is None or _redis_client[0] is not loop:
+        client = aioredis.from_url(
+            settings.redis_broker, socket_connect_timeout=0.5, socket_timeout=0.5
+        )
+        _redis_client = (loop, client)
+    return _redis_client[1]
+
+
+async def _with_fallback(redis_op, mongo_op):
+    """Run `redis_op(client)`; use `mongo_op()` when Redis fails or its breaker is open."""
+    breaker = get_breaker("redis")
+    if breaker.allow():
+        try:
+            result = await redis_op(_redis())
+            breaker.record_success()
+            return result
+        except RedisError:
+            breaker.record_failure()
+    return await mongo_op()
+
+
+async def claim_request(key: str, fingerprint: str) -> bool:
+    """Atomically claim a key for execution; False if it already exists."""
+    now = datetime.utcnow()
+    record = {"status": "in_progress", "fingerprint": fingerprint}
+
+    async def redis_op(r):
+        value = json.dumps(record)
+        return bool(await r.set(f"idem:{key}", value, nx=True, ex=_lease_seconds()))
+
+    async def mongo_op():
+        # Upsert only over a missing or expired record (TTL reaping can lag)
+        try:
+            await database.db.idempotency_keys.update_one(
+                {"_id": key, "expires_at": {"$lte": now}},
+                {
+                    "$set": {
+                        **record,
+                        "created_at": now,
+                        "expires_at": now + timedelta(seconds=_lease_seconds()),
+                    }
+                },
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    return await _with_fallback(redis_op, mongo_op)
+
+
+async def get_request(key: str) -> dict | None:
+    """Return the stored record for a key (None if missing or expired)."""
+
+    async def redis_op(r):
+        value = await r.get(f"idem:{key}")
+        return json.loads(value) if value else None
+
+    async def mongo_op():
+        return await database.db.idempotency_keys.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}
+        )
+
+    return await _with_fallback(redis_op, mongo_op)
+
+
+async def complete_request(key: str, fingerprint: str, status_code: int, body):
+    """Store the final response so duplicates are answered from cache."""
+    record = {
+        "status": "completed",
+        "fingerprint": fingerprint,
+        "status_code": status_code,
+        "body": body,
+    }
+
+    # Redis is (or just was) failing → the key may have been claimed in either
+    # store, and the client's retry may be routed to either one
+    failover = get_breaker("redis").state != "closed"
+
+    async def redis_op(r):
+        await r.set(
+            f"idem:{key}", json.dumps(record), ex=settings.idempotency_ttl_seconds
+        )
+        return True
+
+    async def mongo_op():
+        now = datetime.utcnow()
+        # Upsert: the claim may have been made in Redis before it went down
+        await database.db.idempotency_keys.update_one(
+            {"_id": key},
+            {
+                "$set": {
+                    **record,
+                    "updated_at": now,
+                    "expires_at": now
+                    + timedelta(seconds=settings.idempotency_ttl_seconds),
+                }
+            },
+            upsert=True,
+        )
+        return False
+
+    stored_in_redis = await _with_fallback(redis_op, mongo_op)
+    if stored_in_redis and failover:
+        await mongo_op()
+
+
+async def release_request(key: str):
+    """Forget an in-progress key so the client can retry after a failure."""
+
+    async def redis_op(r):
+        await r.delete(f"idem:{key}")
+
+    async def mongo_op():
+        await database.db.idempotency_keys.delete_one({"_id": key})
+
+    await _with_fallback(redis_op, mongo_op)
+
+
+def request_fingerprint(payload: dict) -> str:
+    """
+    Keyed HMAC of the request body, used only to detect Idempotency-Key reuse.
+
+    Keyed with the server secret so a stored fingerprint cannot be brute-forced
+    offline to recover low-entropy fields such as the registration password.
+    """
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True)
+    return hmac.new(
+        settings.jwt_secret.encode(), raw.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def _replay(record: dict) -> JSONResponse:
+    return JSONResponse(
+        record["body"],
+        status_code=record["status_code"],
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+async def run_idempotent(key: str, payload: dict, handler, status_code: int):
+    """
+    Execute `handler()` at most once per key within the TTL.
+
+    - First request runs the handler and stores its status + body
+    - Concurrent duplicates wait for the in-progress request to finish
+    - Later duplicates are answered from the stored response
+    """
+    fingerprint = request_fingerprint(payload)
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+
+    while not await claim_request(key, fingerprint):
+        record = await get_request(key)
+        # None → released or expired in between; retry the claim after the pause
+        if record is not None:
+            if record["fingerprint"] != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request",
+                )
+            if record["status"] == "completed":
+                return _replay(record)
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        await asyncio.sleep(0.05)
+
+    try:
+        result = await handler()
+    except HTTPException as exc:
+        # Client errors are deterministic → replay them too; server errors may retry
+        if exc.status_code < 500:
+            await complete_request(
+                key, fingerprint, exc.status_code, {"detail": exc.detail}
+            )
+        else:
+            await release_request(key)
+        raise
+    except BaseException:
+        await release_request(key)
+        raise
+
+    body = jsonable_encoder(result)
+    await complete_request(key, fingerprint, status_code, body)
+    return JSONResponse(body, status_code=status_code)
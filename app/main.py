@@ -4,8 +4,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
+from app.coalescing import coalescing_stats
 from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection
+from app.database import connect_to_mongo, close_mongo_connection, ensure_indexes
+from app.profiling import ProfilingMiddleware
 from app.routes import auth, tasks
 
 app = FastAPI(title=settings.app_name, debug=settings.app_debug)
@@ -17,6 +19,7 @@ app = FastAPI(title=settings.app_name, debug=settings.app_debug)
 @app.on_event("startup")
 async def startup_db():
     await connect_to_mongo()
+    await ensure_indexes()
 
 
 @app.on_event("shutdown")
@@ -42,6 +45,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request profiling (not installed at all unless enabled)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
 
 # ==========================
 # Routers
@@ -56,3 +63,11 @@ app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "app": settings.app_name}
+
+
+# ==========================
+# Read coalescing metrics
+# ==========================
+@app.get("/metrics/coalescing")
+async def coalescing_metrics():
+    return coalescing_stats()
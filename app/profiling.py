@@ -0,0 +1,220 @@
+"""
+Opt-in per-request profiling.
+
+Enabled with `profiling_enabled=true`; a request is profiled only when it
+carries `X-Profile: <profiling_token>`. When disabled nothing here is wired
+in: the middleware is not installed, the Mongo listener is not registered
+and `profiled()` returns functions unchanged.
+
+Reports use pyinstrument when installed (HTML or speedscope JSON) and fall
+back to cProfile text stats. Time spent in Mongo, bcrypt and JWT decoding is
+reported separately in a `Server-Timing` header.
+"""
+
+import cProfile
+import functools
+import hmac
+import io
+import pstats
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pymongo import monitoring
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:  # Optional dependency → cProfile fallback
+    Profiler = None
+
+# Seconds spent per category for the request being profiled (None otherwise)
+_timings: ContextVar[dict | None] = ContextVar("profile_timings", default=None)
+
+# cProfile and pyinstrument both allow one active profiler per thread, and every
+# request shares the event loop thread → profile one request at a time
+_profile_active = False
+
+
+# ==========================
+# Timing Hooks
+# ==========================
+
+
+def _add_timing(category: str, seconds: float):
+    timings = _timings.get()
+    if timings is not None:
+        timings[category] = timings.get(category, 0.0) + seconds
+
+
+def profiled(category: str):
+    """Attribute a function's wall time to `category` (no-op unless enabled)."""
+
+    def decorator(fn):
+        if not settings.profiling_enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _timings.get() is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _add_timing(category, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    """Adds each Mongo command's duration to the profiled request."""
+
+    # Motor runs commands on an executor with a copy of the caller's context,
+    # so the request's timing dict is visible here.
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        _add_timing("mongo", event.duration_micros / 1e6)
+
+    def failed(self, event):
+        _add_timing("mongo", event.duration_micros / 1e6)
+
+
+def mongo_event_listeners() -> list:
+    """Listeners to pass to the Mongo client (empty unless profiling is enabled)."""
+    return [MongoTimingListener()] if settings.profiling_enabled else []
+
+
+# ==========================
+# Middleware
+# ==========================
+
+
+def _is_authorized(headers: Headers) -> bool:
+    token = headers.get("x-profile")
+    if not token or not settings.profiling_token:
+        return False
+    return hmac.compare_digest(token, settings.profiling_token)
+
+
+def _server_timing(timings: dict, total: float) -> str:
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+async def _run_profiled(call, fmt: str):
+    """Await `call()` under a profiler; return (report, media_type, extension)."""
+    if Profiler is not None:
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+    else:
+        # cProfile sees everything on the loop thread, not just this request
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        await call()
+    finally:
+        if Profiler is not None:
+            profiler.stop()
+        else:
+            profiler.disable()
+
+    if Profiler is None:
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(50)
+        return out.getvalue(), "text/plain", "txt"
+    if fmt == "speedscope":
+        report = profiler.output(renderer=SpeedscopeRenderer())
+        return report, "application/json", "speedscope.json"
+    return profiler.output(renderer=HTMLRenderer()), "text/html", "html"
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request when it carries a valid `X-Profile` header.
+
+    Plain ASGI (not BaseHTTPMiddleware): every other request is handed straight
+    to the app without wrapping the request or buffering the response. Only
+    one request is profiled at a time; overlapping profiles get a 409.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not _is_authorized(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+
+        global _profile_active
+        if _profile_active:
+            busy = JSONResponse(
+                {"detail": "Another request is already being profiled"},
+                status_code=409,
+            )
+            await busy(scope, receive, send)
+            return
+
+        request = Request(scope)
+        started: dict = {}
+        chunks: list[bytes] = []
+
+        async def capture(message: Message):
+            if message["type"] == "http.response.start":
+                started.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        timings: dict = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        _profile_active = True
+        try:
+            report, media_type, ext = await _run_profiled(
+                lambda: self.app(scope, receive, capture),
+                request.headers.get("x-profile-format", "html"),
+            )
+        finally:
+            _profile_active = False
+            _timings.reset(token)
+        total = time.perf_counter() - start
+
+        status = started["status"]
+        headers = MutableHeaders(raw=list(started.get("headers", [])))
+        headers["Server-Timing"] = _server_timing(timings, total)
+
+        # Store the report and send the real response ...
+        if settings.profiling_output_dir:
+            out_dir = Path(settings.profiling_output_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+            slug = request.url.path.strip("/").replace("/", "_") or "root"
+            path = out_dir / f"{stamp}-{request.method}-{slug}.{ext}"
+            path.write_text(report, encoding="utf-8")
+            headers["X-Profile-Report"] = str(path)
+            body = b"".join(chunks)
+        # ... or replace the response with the report itself
+        else:
+            headers["Content-Type"] = media_type
+            headers["X-Profile-Status"] = str(status)
+            body = report.encode("utf-8")
+            status = 200
+
+        headers["Content-Length"] = str(len(body))
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers.raw}
+        )
+        await send({"type": "http.response.body", "body": body})
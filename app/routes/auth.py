@@ -7,6 +7,7 @@ from app.workers.celery_app import celery_app
 from fastapi import (
     APIRouter,
     Depends,
+    Header,
     HTTPException,
     status,
 )  # FastAPI utilities for routing, dependency injection, and HTTP errors
@@ -14,11 +15,14 @@ from fastapi.security import (
     OAuth2PasswordRequestForm,
 )  # Handles form-based login requests (username/password)
 from jose import jwt  # Library to encode/decode JWT tokens
+from pymongo.errors import DuplicateKeyError
 
 from app.utils.security import hash_password, verify_password
 
 from app.config import settings  # Import global configuration (.env-loaded)
 from app import database  # MongoDB async client (Motor)
+from app.coalescing import get_user_by_username  # Batched/deduplicated user lookups
+from app.idempotency import run_idempotent  # Idempotency-Key replay
 from app.schemas.token_schema import Token
 
 # Pydantic schemas for validation
@@ -52,12 +56,10 @@ def create_access_token(data: dict, expires_delta: int = settings.jwt_expire_min
 # ==========================
 
 
-@router.post(
-    "/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED
-)
-async def register_user(user: UserCreate):
+async def create_user(user: UserCreate) -> UserPublic:
+    """Create the user document and queue the welcome email."""
     # Check if the username already exists in MongoDB
-    existing = await database.db.users.find_one({"username": user.username})
+    existing = await get_user_by_username(user.username)
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
 
@@ -72,8 +74,11 @@ async def register_user(user: UserCreate):
         "created_at": datetime.utcnow(),  # Record creation timestamp
     }
 
-    # Insert user into MongoDB
-    await database.db.users.insert_one(new_user)
+    # Insert user into MongoDB (unique index catches concurrent registrations)
+    try:
+        await database.db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Username already exists")
 
     # ==========================
     # IDEMPOTENT BACKGROUND JOB
@@ -94,6 +99,21 @@ async def register_user(user: UserCreate):
     )
 
 
+@router.post(
+    "/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED
+)
+async def register_user(user: UserCreate, idempotency_key: str | None = Header(None)):
+    # Retries with the same Idempotency-Key replay the first response (no re-hash)
+    if idempotency_key:
+        return await run_idempotent(
+            f"register:{idempotency_key}",
+            user.model_dump(),
+            lambda: create_user(user),
+            status.HTTP_201_CREATED,
+        )
+    return await create_user(user)
+
+
 # ==========================
 # Login and Get Token
 # ==========================
@@ -102,7 +122,7 @@ async def register_user(user: UserCreate):
 @router.post("/login", response_model=Token)
 async def login_user(form_data: OAuth2PasswordRequestForm = Depends()):
     # OAuth2PasswordRequestForm extracts username/password from form-data body
-    user = await database.db.users.find_one({"username": form_data.username})
+    user = await get_user_by_username(form_data.username)
 
     # Check if user exists and password is valid
     if not user or not verify_password(form_data.password, user["hashed_password"]):
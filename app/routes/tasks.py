@@ -6,17 +6,22 @@ from typing import List  # For defining response type hints
 
 from fastapi import (
     APIRouter,
+    Header,
     HTTPException,
     status,
 )  # FastAPI tools for building routes and error handling
-from jose import jwt, JWTError  # For decoding and validating JWT tokens
+from jose import JWTError  # Raised when a JWT is invalid or expired
 
-from app.config import settings  # Load app configuration
 from app import database  # MongoDB connection module
+from app.config import settings  # Load app configuration
+from app.coalescing import task_list_flight  # Shares identical in-flight reads
+from app.idempotency import run_idempotent  # Idempotency-Key replay
 from app.schemas.task_schema import (
     TaskResponse,
     TaskCreate,
 )  # Pydantic schemas for validation
+from app.utils.security import decode_token  # JWT decoding
+from app.write_batching import task_insert_batcher  # Group-commit inserts
 
 # Define router for all /tasks routes
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
@@ -38,9 +43,7 @@ async def get_current_user(token: str) -> str:
 
     try:
         # Decode the JWT to extract the username
-        payload = jwt.decode(
-            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
-        )
+        payload = decode_token(token)
         username: str = payload.get("sub")  # The “sub” claim holds username
         if username is None:
             raise credentials_exception
@@ -50,16 +53,49 @@ async def get_current_user(token: str) -> str:
         raise credentials_exception
 
 
+async def fetch_tasks(username: str, include_archived: bool = False) -> list:
+    """Load a user's tasks (hot collection only by default)."""
+    cursor = database.db.tasks.find({"owner": username})
+    tasks = await cursor.to_list(length=100)  # Limit to 100 results
+
+    # Optionally fill the remaining slots from the cold archive tier
+    if include_archived and len(tasks) < 100:
+        cursor = database.db.tasks_archive.find({"owner": username})
+        tasks += await cursor.to_list(length=100 - len(tasks))
+    return tasks
+
+
+def invalidate_task_lists(username: str):
+    """Stop new GETs from joining task-list reads that started before a write."""
+    for include_archived in (False, True):
+        task_list_flight.invalidate((username, include_archived))
+
+
 # ==========================
 # Create New Task
 # ==========================
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(task: TaskCreate, token: str):
+async def create_task(
+    task: TaskCreate, token: str, idempotency_key: str | None = Header(None)
+):
     # Decode token and get the username of the current user
     username = await get_current_user(token)
 
+    # Retries with the same Idempotency-Key (per user) replay the first response
+    if idempotency_key:
+        return await run_idempotent(
+            f"tasks:{username}:{idempotency_key}",
+            task.model_dump(),
+            lambda: insert_task(task, username),
+            status.HTTP_201_CREATED,
+        )
+    return await insert_task(task, username)
+
+
+async def insert_task(task: TaskCreate, username: str) -> TaskResponse:
+    """Build and save a task document owned by `username`."""
     # Build the task document
     new_task = {
         "_id": str(uuid.uuid4()),
@@ -69,8 +105,12 @@ async def create_task(task: TaskCreate, token: str):
         "created_at": datetime.utcnow(),
     }
 
-    # Save to MongoDB
-    await database.db.tasks.insert_one(new_task)
+    # Save to MongoDB (optionally grouped with concurrent inserts)
+    if settings.task_write_batching:
+        await task_insert_batcher.insert(new_task)
+    else:
+        await database.db.tasks.insert_one(new_task)
+    invalidate_task_lists(username)  # read-your-writes for the next GET
 
     # Return a Pydantic-validated response
     return TaskResponse(
@@ -84,13 +124,14 @@ async def create_task(task: TaskCreate, token: str):
 
 
 @router.get("/", response_model=List[TaskResponse])
-async def get_tasks(token: str):
+async def get_tasks(token: str, include_archived: bool = False):
     # Verify user identity from token
     username = await get_current_user(token)
 
-    # Retrieve all tasks belonging to this user
-    cursor = database.db.tasks.find({"owner": username})
-    tasks = await cursor.to_list(length=100)  # Limit to 100 results
+    # Concurrent identical requests (e.g. parallel tabs) share one query
+    tasks = await task_list_flight.do(
+        (username, include_archived), fetch_tasks, username, include_archived
+    )
 
     # Convert raw MongoDB documents to TaskResponse models
     return [
@@ -115,8 +156,12 @@ async def delete_task(task_id: str, token: str):
     # Verify who is deleting
     username = await get_current_user(token)
 
-    # Delete only if the task belongs to this user
-    result = await database.db.tasks.delete_one({"_id": task_id, "owner": username})
+    # Delete only if the task belongs to this user (hot tier, then archive)
+    query = {"_id": task_id, "owner": username}
+    result = await database.db.tasks.delete_one(query)
+    if result.deleted_count == 0:
+        result = await database.db.tasks_archive.delete_one(query)
+    invalidate_task_lists(username)
 
     # Handle not found or unauthorized attempts
     if result.deleted_count == 0:
@@ -0,0 +1,94 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app import database
+from app.archival import archive_old_tasks
+from app.database import close_mongo_connection, connect_to_mongo  # DB handling
+from app.routes.auth import create_access_token
+from app.routes.tasks import delete_task, get_tasks
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_tasks_and_is_resumable():
+    """Old tasks move to tasks_archive; get_tasks hides them unless asked."""
+
+    # --- Ensure DB is ready ---
+    await connect_to_mongo()
+    owner = f"user_{uuid.uuid4().hex[:6]}"
+    old = datetime.utcnow() - timedelta(days=400)
+
+    old_tasks = [
+        {
+            "_id": str(uuid.uuid4()),
+            "title": f"old task {i}",
+            "description": "",
+            "owner": owner,
+            "created_at": old,
+        }
+        for i in range(5)
+    ]
+    fresh_task = {
+        "_id": str(uuid.uuid4()),
+        "title": "fresh task",
+        "description": "",
+        "owner": owner,
+        "created_at": datetime.utcnow(),
+    }
+    await database.db.tasks.insert_many([*old_tasks, fresh_task])
+
+    # Simulate an interrupted run: one doc already copied but not deleted
+    await database.db.tasks_archive.insert_one(dict(old_tasks[0]))
+
+    # === 1. Archive in small batches ===
+    archived = await archive_old_tasks(older_than_days=365, batch_size=2)
+    assert archived >= 5
+
+    hot = await database.db.tasks.find({"owner": owner}).to_list(length=10)
+    cold = await database.db.tasks_archive.find({"owner": owner}).to_list(length=10)
+    assert [t["_id"] for t in hot] == [fresh_task["_id"]]
+    assert len(cold) == 5
+
+    # === 2. get_tasks reads the hot tier unless include_archived is set ===
+    token = create_access_token({"sub": owner})
+    assert len(await get_tasks(token)) == 1
+    assert len(await get_tasks(token, include_archived=True)) == 6
+
+    # --- Cleanup ---
+    await database.db.tasks.delete_many({"owner": owner})
+    await database.db.tasks_archive.delete_many({"owner": owner})
+    await close_mongo_connection()
+
+
+@pytest.mark.asyncio
+async def test_delete_task_reaches_archived_tasks():
+    """delete_task removes a task even after it has moved to tasks_archive."""
+    await connect_to_mongo()
+    owner = f"user_{uuid.uuid4().hex[:6]}"
+    task_id = str(uuid.uuid4())
+    await database.db.tasks_archive.insert_one(
+        {
+            "_id": task_id,
+            "title": "archived task",
+            "description": "",
+            "owner": owner,
+            "created_at": datetime.utcnow() - timedelta(days=400),
+        }
+    )
+
+    token = create_access_token({"sub": owner})
+    assert await delete_task(task_id, token) == {"detail": "Task deleted"}
+    assert await database.db.tasks_archive.find_one({"_id": task_id}) is None
+
+    # Another user's archived task is still "not found or unauthorized"
+    await database.db.tasks_archive.insert_one({"_id": task_id, "owner": owner})
+    other = create_access_token({"sub": f"user_{uuid.uuid4().hex[:6]}"})
+    with pytest.raises(HTTPException) as exc:
+        await delete_task(task_id, other)
+    assert exc.value.status_code == 404
+
+    # --- Cleanup ---
+    await database.db.tasks_archive.delete_many({"owner": owner})
+    await close_mongo_connection()
@@ -0,0 +1,157 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from app import database
+from app.bulk_import import (
+    has_unique_username_index,
+    insert_users,
+    read_rows,
+    validate_rows,
+)
+
+
+def new_report():
+    return {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0, "failed": 0}
+
+
+class FakeUsers:
+    """Rejects usernames seen before (11000) and any doc flagged `fail`."""
+
+    def __init__(self, existing=(), indexes=None):
+        self.usernames = set(existing)
+        self.indexes = indexes or {"_id_": {"key": [("_id", 1)]}}
+
+    async def index_information(self):
+        return self.indexes
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for i, doc in enumerate(docs):
+            if doc.get("fail"):
+                errors.append({"index": i, "code": 121, "errmsg": "validation"})
+            elif doc["username"] in self.usernames:
+                errors.append({"index": i, "code": 11000, "errmsg": "dup key"})
+            else:
+                self.usernames.add(doc["username"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("users.csv", "username,password\nalice,secret1\nbob,secret2\n"),
+        (
+            "users.ndjson",
+            json.dumps({"username": "alice", "password": "secret1"})
+            + "\n\n"
+            + json.dumps({"username": "bob", "password": "secret2"})
+            + "\n",
+        ),
+    ],
+)
+def test_read_rows_csv_and_ndjson(tmp_path, filename, content):
+    """Format is picked from the extension; blank NDJSON lines are skipped."""
+    path = tmp_path / filename
+    path.write_text(content, encoding="utf-8")
+
+    rows = list(read_rows(str(path)))
+
+    assert rows == [
+        {"username": "alice", "password": "secret1"},
+        {"username": "bob", "password": "secret2"},
+    ]
+
+
+def test_read_rows_explicit_format(tmp_path):
+    path = tmp_path / "users.txt"
+    path.write_text("username,password\nalice,secret1\n", encoding="utf-8")
+
+    assert list(read_rows(str(path), fmt="csv")) == [
+        {"username": "alice", "password": "secret1"}
+    ]
+
+
+def test_malformed_ndjson_and_non_object_rows_are_invalid(tmp_path):
+    """Bad lines are counted as invalid instead of aborting the import."""
+    path = tmp_path / "users.ndjson"
+    path.write_text(
+        '{"username": "alice", "password": "secret1"}\n'
+        '{"username": "bob", "password": \n'  # truncated line
+        '["carol", "secret3"]\n'  # valid JSON, not an object
+        '"dave"\n'
+        '{"username": "erin", "password": "secret5"}\n',
+        encoding="utf-8",
+    )
+    report = new_report()
+
+    users = validate_rows(list(read_rows(str(path))), report)
+
+    assert [u.username for u in users] == ["alice", "erin"]
+    assert report["invalid"] == 3
+
+
+def test_validate_rows_skips_and_counts_invalid():
+    report = new_report()
+    rows = [
+        {"username": "alice", "password": "secret1"},
+        {"username": "al", "password": "secret1"},  # username too short
+        {"username": "carol", "password": "123"},  # password too short
+        {"username": "dave"},  # missing password
+    ]
+
+    users = validate_rows(rows, report)
+
+    assert [u.username for u in users] == ["alice"]
+    assert report["invalid"] == 3
+
+
+@pytest.mark.asyncio
+async def test_insert_users_reports_duplicates_and_failures(monkeypatch):
+    """Only inserted docs are returned; duplicates and other errors are counted."""
+    monkeypatch.setattr(database, "db", SimpleNamespace(users=FakeUsers({"taken"})))
+    report = new_report()
+    docs = [
+        {"_id": "1", "username": "alice"},
+        {"_id": "2", "username": "taken"},
+        {"_id": "3", "username": "bob"},
+        {"_id": "4", "username": "alice"},  # duplicate within the chunk
+        {"_id": "5", "username": "eve", "fail": True},
+    ]
+
+    inserted = await insert_users(docs, report)
+
+    assert [d["_id"] for d in inserted] == ["1", "3"]
+    assert report["duplicates"] == 2
+    assert report["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_insert_users_all_inserted(monkeypatch):
+    monkeypatch.setattr(database, "db", SimpleNamespace(users=FakeUsers()))
+    report = new_report()
+    docs = [{"_id": "1", "username": "alice"}, {"_id": "2", "username": "bob"}]
+
+    assert await insert_users(docs, report) == docs
+    assert await insert_users([], report) == []
+    assert report == new_report()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "indexes, expected",
+    [
+        ({"username_1": {"key": [("username", 1)], "unique": True}}, True),
+        ({"username_1": {"key": [("username", 1)]}}, False),  # not unique
+        ({}, False),
+    ],
+)
+async def test_has_unique_username_index(monkeypatch, indexes, expected):
+    """The CLI refuses to import when duplicates could not be detected."""
+    users = FakeUsers(indexes={"_id_": {"key": [("_id", 1)]}, **indexes})
+    monkeypatch.setattr(database, "db", SimpleNamespace(users=users))
+
+    assert await has_unique_username_index() is expected
@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import database
+from app.coalescing import BatchLoader, SingleFlight
+from app.routes.auth import create_access_token
+from app.routes.tasks import create_task, get_tasks
+from app.schemas.task_schema import TaskCreate
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_identical_queries():
+    """Concurrent calls with the same key run the query once."""
+    calls = []
+
+    async def query(owner):
+        calls.append(owner)
+        await asyncio.sleep(0.01)
+        return [{"owner": owner}]
+
+    flight = SingleFlight("test")
+    results = await asyncio.gather(
+        *(flight.do("alice", query, "alice") for _ in range(5)),
+        flight.do("bob", query, "bob"),
+    )
+
+    assert calls == ["alice", "bob"]
+    assert results[0] is results[4]  # same shared result object
+    assert flight.stats() == {"executed": 2, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_invalidate_starts_fresh_query():
+    """After invalidate(), new callers no longer join the older in-flight query."""
+    calls = []
+
+    async def query(n):
+        calls.append(n)
+        await asyncio.sleep(0.02)
+        return n
+
+    flight = SingleFlight("test")
+    first = asyncio.ensure_future(flight.do("alice", query, 1))
+    await asyncio.sleep(0)
+    flight.invalidate("alice")
+    second = asyncio.ensure_future(flight.do("alice", query, 2))
+    await asyncio.sleep(0)
+    third = flight.do("alice", query, 3)  # joins the fresh query
+
+    assert await asyncio.gather(first, second, third) == [1, 2, 2]
+    assert calls == [1, 2]
+
+
+class SlowTasks:
+    """Fake `tasks` collection whose reads see the data as of `find()`."""
+
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query):
+        snapshot = [d for d in self.docs if d["owner"] == query["owner"]]
+        return SimpleNamespace(to_list=lambda length: self._slow(snapshot))
+
+    async def _slow(self, snapshot):
+        await asyncio.sleep(0.05)
+        return snapshot
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+
+@pytest.mark.asyncio
+async def test_get_after_post_sees_new_task(monkeypatch):
+    """A GET issued after POST returns must not join a read started before it."""
+    monkeypatch.setattr(database, "db", SimpleNamespace(tasks=SlowTasks()))
+    token = create_access_token({"sub": "rw_user"})
+
+    other_tab = asyncio.ensure_future(get_tasks(token))
+    await asyncio.sleep(0.01)  # its query is now in flight
+    await create_task(TaskCreate(title="new task"), token, idempotency_key=None)
+
+    assert [t.title for t in await get_tasks(token)] == ["new task"]
+    assert await other_tab == []
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_merges_point_lookups():
+    """Distinct keys in one window become one batch; missing keys resolve to None."""
+    batches = []
+
+    async def batch_fn(keys):
+        batches.append(sorted(keys))
+        return {k: {"username": k} for k in keys if k != "ghost"}
+
+    loader = BatchLoader("test", batch_fn, window=0.005, max_batch=10)
+    results = await asyncio.gather(
+        loader.load("a"), loader.load("b"), loader.load("a"), loader.load("ghost")
+    )
+
+    assert batches == [["a", "b", "ghost"]]
+    assert results == [{"username": "a"}, {"username": "b"}, {"username": "a"}, None]
+    assert loader.stats() == {"requested": 4, "executed": 1, "coalesced": 1}
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_propagates_errors():
+    """A failing batch query fails every awaiter in that batch."""
+
+    async def batch_fn(keys):
+        raise RuntimeError("mongo down")
+
+    loader = BatchLoader("test", batch_fn, window=0.001)
+    results = await asyncio.gather(
+        loader.load("a"), loader.load("b"), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 
 import pytest
@@ -5,8 +6,11 @@ from httpx import AsyncClient
 
 from app.database import connect_to_mongo, close_mongo_connection  # DB handling
 from app import database
+from app.idempotency import complete_request, request_fingerprint, run_idempotent
 from app.main import app  # FastAPI instance
+from app.routes.auth import create_access_token
 from app.workers import celery_app  # Celery worker instance
+from app.workers.retry_policy import CircuitBreaker, _breakers
 
 
 @pytest.mark.asyncio
@@ -54,3 +58,144 @@ async def test_idempotent_welcome_email():
 
     # --- Clean shutdown ---
     await close_mongo_connection()
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_register():
+    """Duplicate POSTs with the same Idempotency-Key create exactly one user."""
+
+    # --- Ensure DB is ready ---
+    await connect_to_mongo()
+    await database.ensure_indexes()
+
+    username = f"user_{uuid.uuid4().hex[:6]}"
+    payload = {"username": username, "password": "TestPass123!"}
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        # === 1. Concurrent duplicates wait for the first request ===
+        first, second = await asyncio.gather(
+            client.post("/auth/register", json=payload, headers=headers),
+            client.post("/auth/register", json=payload, headers=headers),
+        )
+        # === 2. A later retry is answered from the stored response ===
+        replay = await client.post("/auth/register", json=payload, headers=headers)
+        # === 3. Reusing the key for a different body is rejected ===
+        mismatch = await client.post(
+            "/auth/register",
+            json={**payload, "username": f"{username}_x"},
+            headers=headers,
+        )
+
+    assert first.status_code == second.status_code == replay.status_code == 201
+    assert first.json() == second.json() == replay.json()
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert mismatch.status_code == 422
+
+    users = await database.db.users.find({"username": username}).to_list(length=10)
+    assert len(users) == 1
+
+    # --- Clean shutdown ---
+    await close_mongo_connection()
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_create_task():
+    """Retried POST /tasks with the same Idempotency-Key creates one task."""
+
+    # --- Ensure DB is ready ---
+    await connect_to_mongo()
+
+    owner = f"user_{uuid.uuid4().hex[:6]}"
+    url = f"/tasks/tasks/?token={create_access_token({'sub': owner})}"
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = await client.post(url, json={"title": "buy milk"}, headers=headers)
+        replay = await client.post(url, json={"title": "buy milk"}, headers=headers)
+
+    assert first.status_code == replay.status_code == 201
+    assert first.json() == replay.json()
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert await database.db.tasks.count_documents({"owner": owner}) == 1
+
+    # --- Cleanup ---
+    await database.db.tasks.delete_many({"owner": owner})
+    await close_mongo_connection()
+
+
+@pytest.fixture
+def redis_down():
+    """Force the Redis breaker open so idempotency records go to Mongo."""
+    breaker = CircuitBreaker("redis", failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    previous = _breakers.get("redis")
+    _breakers["redis"] = breaker
+    yield
+    _breakers.pop("redis")
+    if previous is not None:
+        _breakers["redis"] = previous
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_uses_mongo_while_redis_is_down(redis_down):
+    """With the Redis breaker open, records are claimed and replayed from Mongo."""
+
+    # --- Ensure DB is ready ---
+    await connect_to_mongo()
+    await database.ensure_indexes()
+
+    owner = f"user_{uuid.uuid4().hex[:6]}"
+    url = f"/tasks/tasks/?token={create_access_token({'sub': owner})}"
+    key = uuid.uuid4().hex
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        first = await client.post(
+            url, json={"title": "buy milk"}, headers={"Idempotency-Key": key}
+        )
+        replay = await client.post(
+            url, json={"title": "buy milk"}, headers={"Idempotency-Key": key}
+        )
+
+    assert first.status_code == replay.status_code == 201
+    assert first.json() == replay.json()
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert await database.db.tasks.count_documents({"owner": owner}) == 1
+
+    record = await database.db.idempotency_keys.find_one(
+        {"_id": f"tasks:{owner}:{key}"}
+    )
+    assert record["status"] == "completed"
+
+    # --- Cleanup ---
+    await database.db.tasks.delete_many({"owner": owner})
+    await database.db.idempotency_keys.delete_one({"_id": record["_id"]})
+    await close_mongo_connection()
+
+
+@pytest.mark.asyncio
+async def test_completion_reaches_mongo_when_claimed_in_redis(redis_down):
+    """A key claimed in Redis just before it failed still gets its response stored."""
+
+    # --- Ensure DB is ready ---
+    await connect_to_mongo()
+
+    key = f"test:{uuid.uuid4().hex}"
+    payload = {"title": "buy milk"}
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return {"id": "second run"}
+
+    # The claim lived in Redis, so Mongo has no record to update
+    await complete_request(key, request_fingerprint(payload), 201, {"id": "first"})
+    response = await run_idempotent(key, payload, handler, 201)
+
+    assert calls == []  # the retry is answered from Mongo, not re-run
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.body == b'{"id":"first"}'
+
+    # --- Cleanup ---
+    await database.db.idempotency_keys.delete_one({"_id": key})
+    await close_mongo_connection()
@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.config import settings
+from app.profiling import MongoTimingListener, ProfilingMiddleware, profiled
+
+
+@pytest.fixture
+def profiled_app(monkeypatch):
+    """Small app behind ProfilingMiddleware with a Mongo command and a JWT decode."""
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+    monkeypatch.setattr(settings, "profiling_output_dir", "")
+
+    @profiled("jwt_decode")
+    def decode(token):
+        return {"sub": token}
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        # What Motor's command listener reports for one find
+        MongoTimingListener().succeeded(SimpleNamespace(duration_micros=1500))
+        return decode("alice")
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"done": True}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_authorized_request_returns_report(profiled_app):
+    async with AsyncClient(app=profiled_app, base_url="http://test") as client:
+        res = await client.get("/work", headers={"X-Profile": "s3cret"})
+
+    assert res.status_code == 200
+    assert res.headers["x-profile-status"] == "200"
+    assert res.headers["content-type"].split(";")[0] in ("text/html", "text/plain")
+    assert res.text and res.text != '{"sub":"alice"}'
+
+    timing = res.headers["server-timing"]
+    assert "mongo;dur=1.50" in timing
+    assert "jwt_decode;dur=" in timing
+    assert "total;dur=" in timing
+
+
+@pytest.mark.asyncio
+async def test_report_stored_when_output_dir_set(profiled_app, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiling_output_dir", str(tmp_path))
+
+    async with AsyncClient(app=profiled_app, base_url="http://test") as client:
+        res = await client.get("/work", headers={"X-Profile": "s3cret"})
+
+    assert res.json() == {"sub": "alice"}
+    assert "mongo;dur=" in res.headers["server-timing"]
+    assert list(tmp_path.iterdir()) == [tmp_path / res.headers["x-profile-report"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [{}, {"X-Profile": "wrong"}])
+async def test_missing_or_wrong_token_passes_through(profiled_app, headers):
+    async with AsyncClient(app=profiled_app, base_url="http://test") as client:
+        res = await client.get("/work", headers=headers)
+
+    assert res.status_code == 200
+    assert res.json() == {"sub": "alice"}
+    assert "server-timing" not in res.headers
+    assert "x-profile-status" not in res.headers
+
+
+@pytest.mark.asyncio
+async def test_overlapping_profiles_get_409(profiled_app):
+    """Only one profiler can run per thread; the second request is refused."""
+    async with AsyncClient(app=profiled_app, base_url="http://test") as client:
+        first, second = await asyncio.gather(
+            client.get("/slow", headers={"X-Profile": "s3cret"}),
+            client.get("/slow", headers={"X-Profile": "s3cret"}),
+        )
+        # The slot is free again once the first profile finishes
+        third = await client.get("/slow", headers={"X-Profile": "s3cret"})
+
+    assert sorted([first.status_code, second.status_code]) == [200, 409]
+    refused = first if first.status_code == 409 else second
+    assert refused.json() == {"detail": "Another request is already being profiled"}
+    assert third.headers["x-profile-status"] == "200"
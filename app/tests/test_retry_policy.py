@@ -0,0 +1,144 @@
+import time
+
+import pytest
+from pymongo.errors import AutoReconnect, DuplicateKeyError
+
+from app.workers.celery_app import celery_app
+from app.workers.retry_policy import (
+    BoundedRetryTask,
+    CircuitBreaker,
+    CircuitOpenError,
+    _breakers,
+    compute_backoff,
+)
+
+
+def test_backoff_is_capped_and_jittered():
+    """Backoff never exceeds min(cap, base * 2**retries)."""
+    for retries in range(12):
+        delay = compute_backoff(retries, base=1.0, cap=10.0)
+        assert 0 <= delay <= min(10.0, 2**retries)
+
+    # Full jitter → delays vary between calls
+    delays = {compute_backoff(5, base=1.0, cap=10.0) for _ in range(20)}
+    assert len(delays) > 1
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Breaker opens after N failures, half-opens after reset, closes on success."""
+    breaker = CircuitBreaker("mongo", failure_threshold=3, reset_seconds=0.05)
+
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.retry_after() > 0
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+    # A failed trial re-opens immediately
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial at a time while half-open
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+# ==========================
+# BoundedRetryTask (run eagerly with .apply())
+# ==========================
+
+attempts = []
+
+
+@celery_app.task(bind=True, base=BoundedRetryTask, name="test.request_metadata")
+def request_metadata(self):
+    return [self.request.id, self.request.retries]
+
+
+@celery_app.task(
+    bind=True,
+    base=BoundedRetryTask,
+    name="test.always_failing",
+    dependency="test-flaky-db",
+    failure_budget=2,
+    max_deferrals=3,
+)
+def always_failing(self):
+    attempts.append(self.request.retries)
+    raise AutoReconnect("db down")
+
+
+@celery_app.task(
+    bind=True,
+    base=BoundedRetryTask,
+    name="test.duplicate_key",
+    dependency="test-flaky-db",
+    failure_budget=1,
+)
+def duplicate_key(self):
+    raise DuplicateKeyError("dup key", 11000)
+
+
+@pytest.fixture
+def dead_letters(monkeypatch):
+    """Capture dead letters instead of writing them to Mongo."""
+    captured = []
+    monkeypatch.setattr(
+        "app.workers.dead_letters.record_dead_letter",
+        lambda name, args, kwargs, exc, retries, persist=True: captured.append(
+            (name, type(exc).__name__, persist)
+        ),
+    )
+    attempts.clear()
+    _breakers.pop("test-flaky-db", None)
+    return captured
+
+
+def test_task_body_sees_worker_request():
+    """The base class must not hide the request id / retry count from the body."""
+    assert request_metadata.apply(task_id="abc").get() == ["abc", 0]
+
+
+def test_failure_budget_then_dead_letter(dead_letters):
+    """Real failures are retried `failure_budget` times, then dead-lettered."""
+    _breakers["test-flaky-db"] = CircuitBreaker("test-flaky-db", failure_threshold=99)
+
+    result = always_failing.apply()
+
+    assert isinstance(result.result, AutoReconnect)
+    assert attempts == [0, 1, 2]
+    assert dead_letters == [("test.always_failing", "AutoReconnect", True)]
+
+
+def test_deterministic_errors_do_not_trip_breaker(dead_letters):
+    """A duplicate key says nothing about availability → breaker stays closed."""
+    breaker = CircuitBreaker("test-flaky-db", failure_threshold=1)
+    _breakers["test-flaky-db"] = breaker
+
+    result = duplicate_key.apply()
+
+    assert isinstance(result.result, DuplicateKeyError)
+    assert breaker.state == "closed"
+    assert dead_letters == [("test.duplicate_key", "DuplicateKeyError", True)]
+
+
+def test_open_breaker_defers_without_spending_budget(dead_letters):
+    """Open-breaker reschedules skip the body and never write to the failing store."""
+    breaker = CircuitBreaker("test-flaky-db", failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    _breakers["test-flaky-db"] = breaker
+
+    result = always_failing.apply()
+
+    assert attempts == []  # body never ran
+    assert isinstance(result.result, CircuitOpenError)
+    assert dead_letters == [("test.always_failing", "CircuitOpenError", False)]
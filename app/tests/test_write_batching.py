@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteConcernError
+
+from app import database
+from app.write_batching import InsertBatcher
+
+
+class FakeCollection:
+    """Records insert_many calls; rejects documents whose _id was seen before."""
+
+    def __init__(self, concern_error=None):
+        self.calls = []
+        self.ids = set()
+        self.concern_error = concern_error  # Reported for every insert_many
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append(len(docs))
+        errors = []
+        for i, doc in enumerate(docs):
+            if doc["_id"] in self.ids:
+                errors.append({"index": i, "code": 11000, "errmsg": "dup key"})
+            self.ids.add(doc["_id"])
+        if errors or self.concern_error:
+            details = {"writeErrors": errors}
+            if self.concern_error:
+                details["writeConcernErrors"] = [self.concern_error]
+            raise BulkWriteError(details)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_inserts_share_one_flush(monkeypatch):
+    """Concurrent inserts within the window become one insert_many."""
+    fake = FakeCollection()
+    monkeypatch.setattr(database, "db", {"tasks": fake})
+
+    batcher = InsertBatcher("tasks", window=0.01, max_batch=100)
+    await asyncio.gather(*(batcher.insert({"_id": str(i)}) for i in range(10)))
+
+    assert fake.calls == [10]
+    assert batcher.stats() == {"flushes": 1, "inserted": 10}
+
+
+@pytest.mark.asyncio
+async def test_batch_size_and_per_document_errors(monkeypatch):
+    """Full batches flush early; a duplicate fails only its own caller."""
+    fake = FakeCollection()
+    fake.ids.add("dup")
+    monkeypatch.setattr(database, "db", {"tasks": fake})
+
+    batcher = InsertBatcher("tasks", window=10, max_batch=3)
+    results = await asyncio.gather(
+        batcher.insert({"_id": "a"}),
+        batcher.insert({"_id": "dup"}),
+        batcher.insert({"_id": "b"}),
+        return_exceptions=True,
+    )
+
+    assert fake.calls == [3]  # flushed on size, not the 10s window
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], DuplicateKeyError)
+
+
+@pytest.mark.asyncio
+async def test_write_concern_error_fails_every_caller(monkeypatch):
+    """A write concern failure is batch-wide; nobody is told their insert is safe."""
+    fake = FakeCollection(
+        concern_error={"code": 64, "errmsg": "waiting for replication timed out"}
+    )
+    fake.ids.add("dup")
+    monkeypatch.setattr(database, "db", {"tasks": fake})
+
+    batcher = InsertBatcher("tasks", window=0.01, max_batch=100)
+    results = await asyncio.gather(
+        batcher.insert({"_id": "a"}),
+        batcher.insert({"_id": "dup"}),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], WriteConcernError)
+    assert isinstance(results[1], DuplicateKeyError)  # its own error wins
+    assert batcher.stats() == {"flushes": 1, "inserted": 0}
@@ -5,6 +5,7 @@ from jose import jwt  # JWT for token creation and validation
 from passlib.context import CryptContext  # Provides password hashing
 
 from app.config import settings  # Load JWT secret, algorithm, and expiry
+from app.profiling import profiled  # Per-request timing (no-op unless enabled)
 
 # Initialize password hashing using bcrypt
 # Use faster / safer hashing in tests (no bcrypt wrap-bug check)
@@ -18,11 +19,13 @@ else:
 # ==========================
 
 
+@profiled("bcrypt")
 def hash_password(password: str):
     """Hash a plain password securely."""
     return pwd_context.hash(password)  # Returns a bcrypt-hashed version
 
 
+@profiled("bcrypt")
 def verify_password(plain: str, hashed: str):
     """Verify that a plain password matches the stored hash."""
     return pwd_context.verify(plain, hashed)
@@ -45,3 +48,14 @@ def create_refresh_token(data: dict):
     expire = datetime.utcnow() + timedelta(days=settings.jwt_refresh_days)
     data.update({"exp": expire})
     return jwt.encode(data, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+
+# ==========================
+# JWT Token Decoding
+# ==========================
+
+
+@profiled("jwt_decode")
+def decode_token(token: str) -> dict:
+    """Decode and verify a JWT (raises JWTError if invalid or expired)."""
+    return jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
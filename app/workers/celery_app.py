@@ -21,6 +21,7 @@ celery_app = Celery(
 # Register tasks module
 celery_app.conf.imports = (
     "app.workers.tasks.email_tasks",
+    "app.workers.tasks.archive_tasks",
 )
 
 celery_app.conf.update(
@@ -32,6 +33,14 @@ celery_app.conf.update(
     worker_concurrency=2,
 )
 
+# Periodic jobs (run `celery beat` alongside the worker)
+celery_app.conf.beat_schedule = {
+    "archive-old-tasks": {
+        "task": "taskhub.archive_old_tasks",
+        "schedule": settings.archive_interval_seconds,
+    },
+}
+
 
 @worker_process_init.connect
 def init_celery_mongo(**_kwargs):
@@ -0,0 +1,166 @@
+"""
+Mongo-backed dead-letter store for Celery jobs that exhausted their retries.
+
+Replay from the command line:
+    python -m app.workers.dead_letters list
+    python -m app.workers.dead_letters replay --task taskhub.send_welcome_email
+"""
+
+import argparse
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+
+from pymongo.errors import PyMongoError
+
+from app import database
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================
+# Async Mongo Helpers
+# ==========================
+
+
+async def save_dead_letter(
+    task_name: str, args, kwargs, error: str, retries: int
+) -> str:
+    """Insert a dead-letter document and return its id."""
+    letter_id = str(uuid.uuid4())
+    await database.db.dead_letters.insert_one(
+        {
+            "_id": letter_id,
+            "task_name": task_name,
+            "args": list(args or []),
+            "kwargs": dict(kwargs or {}),
+            "error": error,
+            "retries": retries,
+            "status": "pending",
+            "created_at": datetime.utcnow(),
+        }
+    )
+    return letter_id
+
+
+async def get_pending_dead_letters(task_name: str | None = None, limit: int = 100):
+    """Return dead letters that have not been replayed yet (oldest first)."""
+    query = {"status": "pending"}
+    if task_name:
+        query["task_name"] = task_name
+    cursor = database.db.dead_letters.find(query).sort("created_at", 1)
+    return await cursor.to_list(length=limit)
+
+
+async def mark_replayed(letter_id: str, celery_task_id: str):
+    """Flag a dead letter as re-enqueued so it is not replayed twice."""
+    await database.db.dead_letters.update_one(
+        {"_id": letter_id, "status": "pending"},
+        {
+            "$set": {
+                "status": "replayed",
+                "replay_task_id": celery_task_id,
+                "replayed_at": datetime.utcnow(),
+            }
+        },
+    )
+
+
+# ==========================
+# Sync Entry Points (Celery workers / CLI)
+# ==========================
+
+
+def _run(coro):
+    """Run a coroutine on the current thread's loop (Celery workers are synchronous)."""
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
+
+
+def record_dead_letter(
+    task_name: str, args, kwargs, exc: BaseException, retries: int, persist=True
+):
+    """
+    Persist a failed job. If Mongo itself is the outage (or `persist` is False
+    because its breaker is open), log the full payload instead so the job can
+    still be recovered from worker logs.
+    """
+    error = f"{type(exc).__name__}: {exc}"
+    if not persist:
+        logger.error(
+            "Dead letter for %s not stored (Mongo unavailable) args=%r kwargs=%r error=%s",
+            task_name,
+            args,
+            kwargs,
+            error,
+        )
+        return
+    try:
+        letter_id = _run(save_dead_letter(task_name, args, kwargs, error, retries))
+        logger.error("Dead-lettered %s as %s (%s)", task_name, letter_id, error)
+    except PyMongoError:
+        logger.exception(
+            "Could not store dead letter for %s args=%r kwargs=%r error=%s",
+            task_name,
+            args,
+            kwargs,
+            error,
+        )
+
+
+def replay_dead_letters(
+    task_name: str | None = None, limit: int = 100, dry_run: bool = False
+) -> int:
+    """Re-enqueue pending dead letters and return how many were replayed."""
+    # Local import prevents circular import with celery_app
+    from app.workers.celery_app import celery_app
+
+    letters = _run(get_pending_dead_letters(task_name, limit))
+    for letter in letters:
+        if dry_run:
+            print(f"[pending] {letter['_id']} {letter['task_name']} {letter['error']}")
+            continue
+        # Fresh retry budget: the original countdown history is not carried over
+        result = celery_app.send_task(
+            letter["task_name"], args=letter["args"], kwargs=letter["kwargs"]
+        )
+        _run(mark_replayed(letter["_id"], result.id))
+        print(f"Replayed {letter['_id']} → {letter['task_name']} ({result.id})")
+    return len(letters)
+
+
+# ==========================
+# CLI
+# ==========================
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and replay dead letters.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("list", "replay"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--task", help="Only this Celery task name")
+        cmd.add_argument("--limit", type=int, default=100)
+
+    args = parser.parse_args(argv)
+
+    _run(database.connect_to_mongo())
+    try:
+        count = replay_dead_letters(
+            task_name=args.task, limit=args.limit, dry_run=args.command == "list"
+        )
+        print(
+            f"{count} dead letter(s) {'pending' if args.command == 'list' else 'replayed'}"
+        )
+    finally:
+        _run(database.close_mongo_connection())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Bounded, jittered retries + per-dependency circuit breakers for Celery tasks."""
+
+import logging
+import random
+import time
+
+from celery import Task
+from celery.exceptions import Retry
+from pymongo.errors import ConnectionFailure
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================
+# Backoff
+# ==========================
+
+
+def compute_backoff(
+    retries: int,
+    base: float = settings.task_retry_backoff_base,
+    cap: float = settings.task_retry_backoff_max,
+) -> float:
+    """
+    Capped exponential backoff with full jitter.
+    Returns a delay in [0, min(cap, base * 2**retries)] seconds.
+    """
+    window = min(cap, base * (2**retries))
+    return random.uniform(0, window)
+
+
+# ==========================
+# Circuit Breaker
+# ==========================
+
+
+class CircuitOpenError(Exception):
+    """Raised when a dependency's breaker is open and calls are short-circuited."""
+
+    def __init__(self, dependency: str, retry_after: float):
+        # Keep constructor args in `args` so result backends can pickle it
+        super().__init__(dependency, retry_after)
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return f"{self.dependency} circuit is open (retry in {self.retry_after:.1f}s)"
+
+
+class CircuitBreaker:
+    """
+    Minimal closed → open → half-open breaker.
+    State is per worker process; every process trips independently.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = settings.circuit_failure_threshold,
+        reset_seconds: float = settings.circuit_reset_seconds,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a trial call through."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Closed breakers let calls through; half-open ones admit one trial call."""
+        state = self.state
+        if state != "half_open":
+            return state == "closed"
+        now = time.monotonic()
+        # A trial that never reports back frees its slot after reset_seconds
+        if self._trial_started is not None:
+            if now - self._trial_started < self.reset_seconds:
+                return False
+        self._trial_started = now
+        return True
+
+    def release_trial(self):
+        """Free the half-open trial slot without recording an outcome."""
+        self._trial_started = None
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        state = self.state
+        # A failed half-open trial re-opens immediately
+        if state == "half_open" or self.failures >= self.failure_threshold:
+            if state != "open":
+                logger.warning(
+                    "Circuit for %s opened after %s failures", self.name, self.failures
+                )
+            self.opened_at = time.monotonic()
+
+
+# One breaker per dependency name, shared by all tasks in this process
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(dependency: str) -> CircuitBreaker:
+    """Return (creating if needed) the process-wide breaker for a dependency."""
+    if dependency not in _breakers:
+        _breakers[dependency] = CircuitBreaker(dependency)
+    return _breakers[dependency]
+
+
+# ==========================
+# Celery Task Base
+# ==========================
+
+
+class BoundedRetryTask(Task):
+    """
+    Celery base task replacing unbounded `autoretry_for`.
+
+    - Retries failures up to `failure_budget` times with capped, full-jitter backoff
+    - Connectivity errors (`dependency_errors`) feed the `dependency` breaker;
+      deterministic errors (duplicate keys, bad operations) do not
+    - While the breaker is open the task is rescheduled without running; these
+      deferrals do not spend the failure budget (capped by `max_deferrals`)
+    - Jobs that give up are written to `dead_letters` (only logged while the
+      breaker is open, since the dead-letter store is the failing dependency)
+
+    Both counters travel as message headers, so Celery's own `max_retries`
+    is disabled and the limits are enforced here.
+    """
+
+    max_retries = None
+    failure_budget = settings.task_max_retries
+    max_deferrals = settings.circuit_max_deferrals
+    dependency = "mongo"
+    # ConnectionFailure covers AutoReconnect, NetworkTimeout and
+    # ServerSelectionTimeoutError
+    dependency_errors: tuple[type[BaseException], ...] = (ConnectionFailure,)
+
+    def __call__(self, *args, **kwargs):
+        # The worker has already pushed this request's context; calling
+        # `Task.__call__` would push a fresh one and hide id/retries.
+        breaker = get_breaker(self.dependency)
+        failures = self._header("failed_attempts")
+        deferrals = self._header("circuit_deferrals")
+
+        if not breaker.allow():
+            exc = CircuitOpenError(self.dependency, breaker.retry_after())
+            if deferrals >= self.max_deferrals:
+                raise self._give_up(exc, args, kwargs, breaker)
+            # Jitter on top of the breaker's reset window avoids a thundering herd
+            countdown = exc.retry_after + compute_backoff(0)
+            raise self._reschedule(exc, countdown, failures, deferrals + 1)
+
+        try:
+            result = self.run(*args, **kwargs)
+        except Retry:
+            raise
+        except Exception as exc:
+            if isinstance(exc, self.dependency_errors):
+                breaker.record_failure()
+            else:
+                breaker.release_trial()
+            if failures >= self.failure_budget:
+                raise self._give_up(exc, args, kwargs, breaker) from None
+            raise self._reschedule(
+                exc, compute_backoff(failures), failures + 1, deferrals
+            ) from None
+
+        breaker.record_success()
+        return result
+
+    def _header(self, name: str) -> int:
+        """Read a retry counter from the worker request or eager headers."""
+        value = getattr(self.request, name, None)
+        if value is None:
+            value = (self.request.headers or {}).get(name)
+        return int(value or 0)
+
+    def _reschedule(self, exc, countdown: float, failures: int, deferrals: int):
+        return self.retry(
+            exc=exc,
+            countdown=countdown,
+            throw=False,
+            headers={"failed_attempts": failures, "circuit_deferrals": deferrals},
+        )
+
+    def _give_up(self, exc, args, kwargs, breaker: "CircuitBreaker") -> BaseException:
+        # Local import prevents circular import with celery_app
+        from app.workers.dead_letters import record_dead_letter
+
+        record_dead_letter(
+            self.name,
+            args,
+            kwargs,
+            exc,
+            self.request.retries,
+            persist=breaker.state == "closed",
+        )
+        return exc
@@ -0,0 +1,31 @@
+import asyncio
+
+from app.workers.celery_app import celery_app
+from app.workers.retry_policy import BoundedRetryTask
+
+
+@celery_app.task(
+    bind=True,
+    base=BoundedRetryTask,
+    name="taskhub.archive_old_tasks",
+)
+def archive_old_tasks(self, max_batches: int | None = None):
+    """
+    Periodic job moving old tasks into `tasks_archive`.
+    Safe to retry: every batch is copy-then-delete and resumes where it stopped.
+    """
+
+    # Local import prevents circular import with celery_app
+    from app import archival
+
+    # Get or create event loop (Celery workers are synchronous)
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    archived = loop.run_until_complete(
+        archival.archive_old_tasks(max_batches=max_batches)
+    )
+    return {"archived": archived}
@@ -2,12 +2,12 @@ import asyncio
 from datetime import datetime
 
 from app.workers.celery_app import celery_app
+from app.workers.retry_policy import BoundedRetryTask
 
 
 @celery_app.task(
     bind=True,
-    autoretry_for=(Exception,),
-    retry_backoff=True,
+    base=BoundedRetryTask,  # bounded jittered retries + Mongo circuit breaker
     name="taskhub.send_welcome_email",
 )
 def send_welcome_email(self, email: str, job_id: str):
@@ -0,0 +1,117 @@
+"""
+Group-commit write batching.
+
+Concurrent `insert` calls are collected for up to `window` seconds (or
+`max_batch` documents) and flushed with one unordered `insert_many`. Each
+caller's future resolves with its own outcome: a per-document write error
+fails only that caller, while a batch-level error (including a write concern
+failure) fails the whole batch.
+"""
+
+import asyncio
+
+from pymongo.errors import (
+    BulkWriteError,
+    DuplicateKeyError,
+    WriteConcernError,
+    WriteError,
+)
+
+from app import database
+from app.config import settings
+
+DUPLICATE_KEY = 11000
+
+
+class InsertBatcher:
+    """Write-behind batcher for inserts into a single collection."""
+
+    def __init__(
+        self,
+        collection: str,
+        window: float = settings.write_batch_window_ms / 1000,
+        max_batch: int = settings.write_batch_max_size,
+    ):
+        self.collection = collection
+        self.window = window
+        self.max_batch = max_batch
+        self.flushes = 0
+        self.inserted = 0
+        self._pending: list = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._running: set = set()  # Strong refs so flush tasks are not GC'd
+
+    async def insert(self, doc: dict):
+        """Queue `doc` for the next flush and wait until it has been written."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # New event loop (e.g. per-test loops) → drop state bound to the old one
+            self._loop, self._pending, self._timer = loop, [], None
+
+        fut = loop.create_future()
+        self._pending.append((doc, fut))
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        # Shield so a cancelled request does not cancel the shared flush
+        await asyncio.shield(fut)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._flush(pending))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _flush(self, pending: list):
+        self.flushes += 1
+        docs = [doc for doc, _ in pending]
+        errors: dict[int, Exception] = {}
+        try:
+            await database.db[self.collection].insert_many(docs, ordered=False)
+        except BulkWriteError as exc:
+            for err in exc.details.get("writeErrors", []):
+                error_cls = (
+                    DuplicateKeyError
+                    if err.get("code") == DUPLICATE_KEY
+                    else WriteError
+                )
+                errors[err["index"]] = error_cls(
+                    err.get("errmsg"), err.get("code"), err
+                )
+            # Write concern failures are batch-wide: every document without its
+            # own error was written but not acknowledged as durable
+            concern_errors = exc.details.get("writeConcernErrors", [])
+            if concern_errors:
+                err = concern_errors[0]
+                for i in range(len(pending)):
+                    errors.setdefault(
+                        i,
+                        WriteConcernError(err.get("errmsg"), err.get("code"), err),
+                    )
+        except Exception as exc:
+            for _, fut in pending:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        for i, (_, fut) in enumerate(pending):
+            if fut.done():
+                continue
+            if i in errors:
+                fut.set_exception(errors[i])
+            else:
+                self.inserted += 1
+                fut.set_result(None)
+
+    def stats(self) -> dict:
+        return {"flushes": self.flushes, "inserted": self.inserted}
+
+
+# Shared batcher for POST /tasks (used when task_write_batching is enabled)
+task_insert_batcher = InsertBatcher("tasks")